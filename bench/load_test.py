@@ -0,0 +1,235 @@
+"""
+QUANTUM X PRO - Load Test Harness
+Boots app.py in-process against a throwaway SQLite DB seeded with bench
+licenses, replaces the broker adapters with a local stand-in that serves
+MarketDataFeed.generate_stochastic_candles, and drives /predict,
+/api/check_device_sync and /api/validate_license over real HTTP at a fixed
+concurrency. Reports requests/sec and p50/p95/p99 latency per endpoint.
+
+Usage:
+    python bench/load_test.py --concurrency 32 --duration 20
+    python bench/load_test.py --endpoints predict --broker-latency-ms 150 --json bench_output.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("predict", "check_device_sync", "validate_license")
+MARKETS = [
+    "EUR/USD (OTC)", "GBP/USD (OTC)", "USD/JPY (OTC)", "AUD/CAD (OTC)", "NZD/USD (OTC)",
+    "USD/BRL (OTC)", "EUR/JPY (OTC)", "GBP/JPY (OTC)", "USD/INR (OTC)", "USD/HKD (OTC)",
+]
+
+
+class FakeBrokerAdapter:
+    """Stand-in for a broker adapter: always connected, synthetic candles, optional network delay."""
+
+    def __init__(self, feed, latency_ms=0):
+        self.feed = feed
+        self.latency = latency_ms / 1000.0
+        self.connected = True
+        self.balance = 0.0
+        self.account_type = "BENCH"
+        self.calls = 0
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def get_candles(self, asset, tf_seconds, count=250):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.feed.generate_stochastic_candles(asset, max(1, tf_seconds // 60))
+
+
+def boot_app(workdir, log_level):
+    """Imports app.py with a private working dir (security.db lives there) and SQLite mode."""
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = ""  # load_dotenv() does not override it -> SQLite mode
+    os.environ.setdefault("LOG_LEVEL", log_level)
+    os.environ.setdefault("WEB_CONCURRENCY", "1")  # one threaded server process
+    for name in ENDPOINTS:
+        os.environ[f"RATE_LIMIT_{name.upper()}"] = "1000000000/60"
+    sys.path.insert(0, REPO_ROOT)
+    import app as qx
+    qx.create_app()
+    qx.init_db()
+    return qx
+
+
+def install_fake_broker(qx, latency_ms):
+    feed = qx.get_data_feed()
+    feed.ws_started = True  # no Binary.com / Quotex sockets
+    adapter = FakeBrokerAdapter(feed, latency_ms)
+    # Overwrite unconditionally: the heartbeat job may have created a real adapter already
+    feed.adapters["QUOTEX"] = adapter
+    return adapter
+
+
+def seed_licenses(qx, count):
+    conn, db_type = qx.get_db_connection()
+    now = datetime.datetime.utcnow()
+    rows = [
+        (f"BENCH-{i:04d}-LOAD", "USER", "ACTIVE", f"bench-device-{i:04d}",
+         (now + datetime.timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S"), now.strftime("%Y-%m-%d %H:%M:%S"))
+        for i in range(count)
+    ]
+    cur = conn.cursor()
+    cur.executemany("""
+        INSERT OR REPLACE INTO licenses (key_code, category, status, device_id, expiry_date, activation_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    cur.close()
+    qx.release_db_connection(conn, db_type)
+    return [(key, device) for key, _, _, device, _, _ in rows]
+
+
+def start_server(qx):
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    server = make_server("127.0.0.1", 0, qx.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def build_request(endpoint, i, licenses, markets):
+    key, device = licenses[i % len(licenses)]
+    if endpoint == "predict":
+        return "/predict", {"license_key": key, "device_id": device, "market": markets[i % len(markets)],
+                            "broker": "QUOTEX", "timeframe": "M1", "timezone": "UTC"}
+    if endpoint == "check_device_sync":
+        return "/api/check_device_sync", {"device_id": device}
+    return "/api/validate_license", {"key": key, "device_id": device}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values)) - 1  # nearest-rank
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def run_scenario(base_url, endpoint, concurrency, duration, warmup, licenses, markets):
+    results = []  # (latency_s, status)
+    lock = threading.Lock()
+    counter = [0]
+
+    def worker(deadline, record):
+        session = requests.Session()
+        local = []
+        while time.perf_counter() < deadline:
+            with lock:
+                i = counter[0]
+                counter[0] += 1
+            path, body = build_request(endpoint, i, licenses, markets)
+            started = time.perf_counter()
+            try:
+                status = session.post(base_url + path, json=body, timeout=30).status_code
+            except requests.RequestException:
+                status = 0
+            local.append((time.perf_counter() - started, status))
+        if record:
+            with lock:
+                results.extend(local)
+
+    for record, seconds in ((False, warmup), (True, duration)):
+        if seconds <= 0:
+            continue
+        started = time.perf_counter()
+        deadline = started + seconds
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker, deadline, record)
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    ok = sum(n for status, n in statuses.items() if 200 <= status < 300)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "ok": ok,
+        "errors": len(results) - ok,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def print_report(rows):
+    print("=" * 92)
+    print(f"{'endpoint':<20}{'conc':>6}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>8}")
+    print("-" * 92)
+    for r in rows:
+        print(f"{r['endpoint']:<20}{r['concurrency']:>6}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>8.0f}")
+    print("=" * 92)
+    for r in rows:
+        if r["errors"]:
+            print(f"[BENCH] {r['endpoint']} status codes: {r['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantum X PRO load test (local fake broker, seeded SQLite)")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per endpoint")
+    parser.add_argument("--licenses", type=int, default=200, help="seeded ACTIVE licenses (one device each)")
+    parser.add_argument("--markets", type=int, default=len(MARKETS), help="distinct OTC markets requested by /predict")
+    parser.add_argument("--broker-latency-ms", type=int, default=0, help="simulated broker round-trip per candle fetch")
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    output = os.path.abspath(args.json) if args.json else None  # before boot_app changes the cwd
+    workdir = tempfile.mkdtemp(prefix="qx-bench-")
+    print(f"[BENCH] Working dir: {workdir}")
+    qx = boot_app(workdir, args.log_level)
+    adapter = install_fake_broker(qx, args.broker_latency_ms)
+    licenses = seed_licenses(qx, args.licenses)
+    server, base_url = start_server(qx)
+    print(f"[BENCH] Serving on {base_url} | {len(licenses)} licenses | broker latency {args.broker_latency_ms}ms")
+
+    markets = MARKETS[:max(1, min(args.markets, len(MARKETS)))]
+    rows = []
+    for endpoint in endpoints:
+        print(f"[BENCH] {endpoint}: {args.concurrency} workers x {args.duration}s ...")
+        rows.append(run_scenario(base_url, endpoint, args.concurrency, args.duration, args.warmup, licenses, markets))
+    server.shutdown()
+
+    print_report(rows)
+    print(f"[BENCH] Fake broker candle fetches: {adapter.calls}")
+    if output:
+        with open(output, "w") as f:
+            json.dump({"config": vars(args), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+QUANTUM X PRO - Startup Import-Time Benchmark
+Imports app.py in a fresh interpreter under `python -X importtime` (best of
+--repeat runs, throwaway working dir, SQLite mode) and reports the import
+time, the slowest modules in app's import tree and the threads alive right
+after the import. The web framework (Flask, werkzeug, click, ...) is imported
+first and reported on its own: its cost depends on the installed versions,
+not on this code, so --budget-ms applies to app's own import only. Fails
+(exit 1) when that exceeds the budget, when a module that must load lazily
+(broker SDKs, requests, numpy) is imported eagerly, or when importing app
+starts background threads.
+
+Usage:
+    python bench/startup.py
+    python bench/startup.py --budget-ms 60 --top 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use only; importing any of these at startup is a regression
+LAZY_MODULES = ("pyquotex", "brokers.quotex_pyquotex", "brokers.forex_ws", "websocket", "requests", "numpy", "bs4")
+# Threads a bare `import app` may leave running: the main thread and the log listener
+EXPECTED_THREADS = 2
+# Third-party packages app imports at module level; timed separately from app itself
+FRAMEWORK_MODULES = ("flask", "flask_cors", "click", "dotenv")
+PROBE = f"import {', '.join(FRAMEWORK_MODULES)}; import threading, app; print(threading.active_count())"
+
+
+def parse_importtime(stderr):
+    """-> [(module, depth, self_us, cumulative_us)] in the order the interpreter reports them"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def app_tree(rows):
+    """Rows of app's own import tree (children are reported before their parent)"""
+    end = next(i for i, row in enumerate(rows) if row[0] == "app" and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def measure(workdir):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, DATABASE_URL="", LOG_LEVEL="ERROR")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=workdir, env=env,
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    framework_us = sum(cum_us for name, depth, _, cum_us in rows if depth == 0 and name in FRAMEWORK_MODULES)
+    return app_tree(rows), framework_us, {name for name, _, _, _ in rows}, int(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantum X PRO startup import-time benchmark")
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", 100)),
+                        help="limit for app's own import, framework excluded (env STARTUP_BUDGET_MS)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters; the fastest run is reported")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="qx-startup-")
+    runs = [measure(workdir) for _ in range(max(1, args.repeat))]
+    tree, framework_us, modules, threads = min(runs, key=lambda run: run[0][-1][3])
+    total_ms = tree[-1][3] / 1000
+    framework_ms = framework_us / 1000
+    eager = sorted(m for m in LAZY_MODULES if m in modules)
+    slowest = sorted(tree[:-1], key=lambda row: row[3], reverse=True)[:args.top]
+    direct = sorted((row for row in tree if row[1] == 1), key=lambda row: row[3], reverse=True)[:args.top]
+
+    print("=" * 72)
+    print(f"import app: {total_ms:.1f} ms (best of {len(runs)}; budget {args.budget_ms:.0f} ms) | "
+          f"{len(tree)} modules | self {tree[-1][2] / 1000:.1f} ms")
+    print(f"framework ({', '.join(FRAMEWORK_MODULES)}): {framework_ms:.1f} ms, not counted against the budget")
+    print("-" * 72)
+    print(f"{'direct imports of app':<48}{'cumulative ms':>14}{'self ms':>10}")
+    for name, _, self_us, cum_us in direct:
+        print(f"{name:<48}{cum_us / 1000:>14.1f}{self_us / 1000:>10.1f}")
+    print("-" * 72)
+    print(f"{'slowest modules (any depth)':<48}{'cumulative ms':>14}{'self ms':>10}")
+    for name, _, self_us, cum_us in slowest:
+        print(f"{name:<48}{cum_us / 1000:>14.1f}{self_us / 1000:>10.1f}")
+    print("=" * 72)
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.1f} ms, budget is {args.budget_ms:.0f} ms")
+    if eager:
+        failures.append(f"imported eagerly (must load on first use): {', '.join(eager)}")
+    if threads > EXPECTED_THREADS:
+        failures.append(f"{threads} threads alive after import (expected {EXPECTED_THREADS}); start them in create_app()")
+    for failure in failures:
+        print(f"[STARTUP] FAIL: {failure}")
+    if not failures:
+        print("[STARTUP] OK")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "import_ms": round(total_ms, 1),
+                "framework_ms": round(framework_ms, 1),
+                "budget_ms": args.budget_ms,
+                "modules": len(tree),
+                "threads_after_import": threads,
+                "eager_lazy_modules": eager,
+                "slowest": [{"module": n, "cumulative_ms": c / 1000, "self_ms": s / 1000} for n, _, s, c in slowest],
+                "failures": failures,
+            }, f, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
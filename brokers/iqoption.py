@@ -1,5 +1,6 @@
 import time
 import threading
+import logging
 from functools import wraps
 
 try:
@@ -8,6 +9,8 @@ try:
 except ImportError:
     LIB_AVAILABLE = False
 
+log = logging.getLogger("qx.brokers.iqoption")
+
 def retry_on_failure(max_retries=3, delay=2):
     """Decorator for retrying failed operations"""
     def decorator(func):
@@ -139,13 +142,13 @@ class IQOptionAdapter:
                             "ts": int(c.get("from", c.get("ts", time.time())))
                         })
                     except (ValueError, TypeError) as e:
-                        print(f"[IQ] Error parsing candle: {e}")
+                        log.debug("Error parsing candle: %s", e)
                         continue
                 
                 return norm if norm else None
                 
             except Exception as e:
-                print(f"[IQ] Candle fetch failed: {e}")
+                log.warning("Candle fetch failed: %s", e)
                 if "connection" in str(e).lower() or "timeout" in str(e).lower():
                     self.connected = False
                 return None
@@ -1,5 +1,6 @@
 import time
 import threading
+import logging
 from functools import wraps
 
 try:
@@ -8,6 +9,8 @@ try:
 except ImportError:
     LIB_AVAILABLE = False
 
+log = logging.getLogger("qx.brokers.quotex")
+
 def retry_on_failure(max_retries=3, delay=2):
     """Decorator for retrying failed operations"""
     def decorator(func):
@@ -198,7 +201,7 @@ class QuotexAdapter:
             return norm if norm else None
             
         except Exception as e:
-            print(f"[QUOTEX] Candle fetch failed: {e}")
+            log.warning("Candle fetch failed: %s", e)
             # Mark as disconnected on critical errors
             if "connection" in str(e).lower() or "timeout" in str(e).lower():
                 self.connected = False
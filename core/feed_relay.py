@@ -0,0 +1,112 @@
+"""
+QUANTUM X PRO - Broker Candle Relay
+Only the leader process holds broker sessions. Followers get a RelayAdapter
+in place of each broker adapter: it asks the leader for candles through the
+shared state (a demand entry) and waits briefly for the leader to publish
+them. Candles are keyed per minute, so a follower never analyzes last
+minute's data as the current minute.
+"""
+import threading
+import time
+
+from core.logs import get_logger
+
+log = get_logger("relay")
+
+
+class CandleRelay:
+    def __init__(self, shared, wait=3.0, poll=0.1, ttl=120):
+        self.shared = shared
+        self.wait = wait
+        self.poll = poll
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.published = 0
+        self.served_demands = 0
+        self.relay_hits = 0
+        self.relay_timeouts = 0
+
+    @staticmethod
+    def key(broker, asset, tf_seconds):
+        return f"{broker}|{asset}|{int(tf_seconds)}|{int(time.time() // 60)}"
+
+    def publish(self, broker, asset, tf_seconds, candles):
+        """Leader: share freshly fetched candles with the followers."""
+        self.publish_key(self.key(broker, asset, tf_seconds), candles)
+
+    def publish_key(self, key, candles):
+        """Publishes under an exact key (a demand made just before a minute rollover keeps its minute)."""
+        if not candles:
+            return
+        try:
+            self.shared.set("candles", key, candles, ttl=self.ttl)
+            with self._lock:
+                self.published += 1
+        except Exception as e:
+            log.debug("Publish failed: %s", e)
+
+    def fetch(self, broker, asset, tf_seconds):
+        """Follower: candles for the current minute, asking the leader if they are not there yet."""
+        key = self.key(broker, asset, tf_seconds)
+        candles = self.shared.get("candles", key)
+        if candles is None:
+            self.shared.set("candle_demand", key, (broker, asset, int(tf_seconds)), ttl=self.wait * 4)
+            deadline = time.time() + self.wait
+            while candles is None and time.time() < deadline:
+                time.sleep(self.poll)
+                candles = self.shared.get("candles", key)
+        with self._lock:
+            if candles is None:
+                self.relay_timeouts += 1
+            else:
+                self.relay_hits += 1
+        return candles
+
+    def serve_demands(self, fetch_fn):
+        """Leader: fetch_fn(broker, asset, tf_seconds) -> candles for every pending follower demand."""
+        served = 0
+        for key, (broker, asset, tf_seconds) in self.shared.items("candle_demand"):
+            if self.shared.get("candles", key) is None:
+                try:
+                    self.publish_key(key, fetch_fn(broker, asset, tf_seconds))
+                except Exception as e:
+                    log.debug("Demand %s failed: %s", key, e)
+            self.shared.delete("candle_demand", key)
+            served += 1
+        with self._lock:
+            self.served_demands += served
+        return served
+
+    def stats(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "served_demands": self.served_demands,
+                "relay_hits": self.relay_hits,
+                "relay_timeouts": self.relay_timeouts,
+            }
+
+
+class RelayAdapter:
+    """Follower stand-in for a broker adapter: same get_candles() contract, no broker session."""
+    relay = True
+
+    def __init__(self, broker, relay, election):
+        self.broker = broker
+        self.relay_source = relay
+        self.election = election
+        self.balance = 0.0
+        self.account_type = "RELAY"
+
+    @property
+    def connected(self):
+        return self.election.leader_alive()
+
+    def connect(self):
+        return self.connected
+
+    def disconnect(self):
+        pass
+
+    def get_candles(self, asset, tf_seconds, count=250):
+        return self.relay_source.fetch(self.broker, asset, tf_seconds)
@@ -0,0 +1,185 @@
+"""
+QUANTUM X PRO - Leader Election
+Exactly one process within the lock's scope runs the singleton services. A
+Postgres session advisory lock spans every host on the database; an flock()ed
+file spans the workers of one host, which is the scope of anything that
+followers reach through the host-local shared state (candle relay, broker
+sessions). Both are released by the OS/DB when the holding process dies, so a
+follower takes over on its next try.
+"""
+import os
+import time
+import zlib
+
+from core.logs import get_logger
+
+log = get_logger("leader")
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: single process, always leader
+    fcntl = None
+
+
+class FileLeaderLock:
+    kind = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def try_acquire(self):
+        if fcntl is None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def is_held(self):
+        return fcntl is None or self._fd is not None
+
+    def release(self):
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+class PostgresLeaderLock:
+    kind = "postgres"
+
+    def __init__(self, get_pool, name):
+        self.get_pool = get_pool  # pool may be created after boot
+        self.key = zlib.crc32(name.encode())  # stable 32-bit advisory lock id
+        self._conn = None
+
+    def try_acquire(self):
+        pool = self.get_pool()
+        if pool is None:
+            return False
+        conn = pool.getconn()
+        try:
+            conn.autocommit = True
+            cur = conn.cursor()
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+            acquired = cur.fetchone()[0]
+            cur.close()
+        except Exception:
+            pool.putconn(conn, close=True)
+            raise
+        if not acquired:
+            conn.autocommit = False
+            pool.putconn(conn)
+            return False
+        self._conn = conn  # the lock lives as long as this session; keep it out of the pool
+        return True
+
+    def is_held(self):
+        if self._conn is None:
+            return False
+        try:
+            cur = self._conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            return True
+        except Exception:
+            self._drop(close=True)
+            return False
+
+    def _drop(self, close=False):
+        pool = self.get_pool()
+        if self._conn is not None and pool is not None:
+            try:
+                pool.putconn(self._conn, close=close)
+            except Exception:
+                pass
+        self._conn = None
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                cur = self._conn.cursor()
+                cur.execute("SELECT pg_advisory_unlock(%s)", (self.key,))
+                cur.close()
+                self._conn.autocommit = False
+            except Exception:
+                self._drop(close=True)
+                return
+            self._drop()
+
+
+class LeaderElection:
+    def __init__(self, lock, interval=15, shared=None):
+        self.lock = lock
+        self.interval = interval
+        self.shared = shared  # optional: advertises the leader so followers can tell it is alive
+        self.is_leader = False
+        self.elected_at = None
+        self.terms = 0
+        self._callbacks = []
+
+    def on_elected(self, fn):
+        """fn() runs each time this process becomes leader; services it starts must be idempotent."""
+        self._callbacks.append(fn)
+
+    def _advertise(self):
+        if self.shared is not None:
+            try:
+                self.shared.set("leader", "current", {"pid": os.getpid(), "since": self.elected_at},
+                                ttl=self.interval * 3)
+            except Exception:
+                pass
+
+    def leader_alive(self):
+        if self.is_leader:
+            return True
+        if self.shared is None:
+            return False
+        try:
+            return self.shared.get("leader", "current") is not None
+        except Exception:
+            return False
+
+    def check(self):
+        try:
+            if self.is_leader:
+                if self.lock.is_held():
+                    self._advertise()
+                    return
+                self.is_leader = False
+                log.warning("Leadership lost (%s lock)", self.lock.kind)
+            if not self.lock.try_acquire():
+                return
+        except Exception as e:
+            log.warning("Election attempt failed: %s", e)
+            return
+        self.is_leader = True
+        self.elected_at = time.time()
+        self.terms += 1
+        self._advertise()
+        log.warning("Process %s elected leader (%s lock)", os.getpid(), self.lock.kind)
+        for fn in self._callbacks:
+            try:
+                fn()
+            except Exception as e:
+                log.error("Leader callback %s failed: %s", getattr(fn, "__name__", fn), e)
+
+    def stats(self):
+        return {
+            "is_leader": self.is_leader,
+            "pid": os.getpid(),
+            "lock": self.lock.kind,
+            "terms": self.terms,
+            "elected_at": self.elected_at,
+            "leader_alive": self.leader_alive(),
+        }
@@ -0,0 +1,134 @@
+"""
+QUANTUM X PRO - License Verification Cache
+Bounded, thread-safe TTL/LRU store for verified licenses and device bindings.
+Failed lookups (unknown key, blocked license) are remembered for a short
+negative TTL so brute-force or buggy clients don't reach the database on
+every request.
+With a shared backend (core.shared_state) entries are written through to it
+and local copies live at most local_ttl seconds, so an invalidation in one
+worker reaches the others within that window.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Cached rejection: verify paths return error_code without touching the DB
+Negative = namedtuple("Negative", ["error_code"])
+
+
+class LicenseCache:
+    def __init__(self, maxsize=20000, ttl=300, negative_ttl=30, shared=None, local_ttl=2):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def get(self, key):
+        """Returns the cached value (possibly a Negative) or None."""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self._count_hit_locked(value)
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            if self.shared is None:
+                self.misses += 1
+                return None
+
+        try:
+            value = self.shared.get("license", key)
+        except Exception:
+            value = None
+            with self._lock:
+                self.shared_errors += 1
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._count_hit_locked(value)
+            self._store_locked(key, value, now + self.local_ttl)
+            return value
+
+    def _count_hit_locked(self, value):
+        if isinstance(value, Negative):
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+
+    def _store_locked(self, key, value, expires_at):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._shrink_locked()
+
+    def put(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if self.shared is not None:
+            try:
+                self.shared.set("license", key, value, ttl=ttl)
+            except Exception:
+                with self._lock:
+                    self.shared_errors += 1
+            ttl = min(ttl, self.local_ttl)
+        with self._lock:
+            self._store_locked(key, value, time.time() + ttl)
+
+    def put_negative(self, key, error_code):
+        self.put(key, Negative(error_code), ttl=self.negative_ttl)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+        if self.shared is not None and keys:
+            try:
+                self.shared.delete("license", *keys)
+            except Exception:
+                with self._lock:
+                    self.shared_errors += 1
+
+    def _shrink_locked(self):
+        # Expired entries go first; then least recently used
+        now = time.time()
+        for key in [k for k, (exp, _) in self._data.items() if exp <= now]:
+            del self._data[key]
+            self.expirations += 1
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "shared": self.shared is not None,
+                "shared_hits": self.shared_hits,
+                "shared_errors": self.shared_errors,
+            }
@@ -0,0 +1,207 @@
+"""
+QUANTUM X PRO - Local SQLite Mirror of Postgres Licenses
+The local SQLite file is the fallback when Postgres is down, so licenses seen
+in Postgres are copied into it. Logins only queue the license row in memory
+(latest row per key wins); a periodic flush upserts all queued rows in one
+SQLite transaction. A full snapshot copies every license at startup (rows
+only present locally, like the master fallback keys, are left alone), and
+workers sharing the file skip it when another one finished within min_age
+seconds.
+"""
+import datetime
+import threading
+import time
+
+from core.logs import get_logger
+
+log = get_logger("license_mirror")
+
+COLUMNS = ("key_code", "category", "status", "device_id", "ip_address", "user_agent", "usage_count",
+           "last_access_date", "expiry_date", "activation_date", "country", "city", "timezone_geo")
+SNAPSHOT_SETTING = "license_mirror_snapshot_at"
+
+
+def _sqlite_value(value):
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _upsert_sql(columns):
+    updates = ", ".join(f"{c}=excluded.{c}" for c in columns if c != "key_code")
+    return (f"INSERT INTO licenses ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(key_code) DO UPDATE SET {updates}")
+
+
+class LicenseMirror:
+    RECORD_COLUMNS = ("key_code", "category", "status", "device_id", "expiry_date", "activation_date")
+
+    def __init__(self, get_source, release_source, get_sqlite, release_sqlite, flush_interval=10,
+                 batch_size=1000, min_age=300):
+        """get_source() -> (conn, db_type); release_source(conn, db_type); get_sqlite() -> conn; release_sqlite(conn)"""
+        self.get_source = get_source
+        self.release_source = release_source
+        self.get_sqlite = get_sqlite
+        self.release_sqlite = release_sqlite
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.min_age = min_age
+        self._pending = {}  # key_code -> row tuple in RECORD_COLUMNS order
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+        self.snapshots = 0
+        self.snapshots_skipped = 0
+        self.snapshot_rows = 0
+        self.last_snapshot_ms = 0.0
+        self.last_error = None
+
+    def record(self, key_code, category, status, device_id, expiry_date, activation_date):
+        """Queues a license row read from Postgres; never touches SQLite on the request path."""
+        if not key_code:
+            return
+        row = tuple(_sqlite_value(v) for v in (key_code, category, status, device_id, expiry_date, activation_date))
+        with self._lock:
+            self._pending[key_code] = row
+            self.recorded += 1
+
+    def _merge_back(self, batch):
+        """Failed flushes are retried next cycle; rows queued since then are newer and win."""
+        with self._lock:
+            for key_code, row in batch.items():
+                self._pending.setdefault(key_code, row)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            conn = None
+            try:
+                conn = self.get_sqlite()
+                cur = conn.cursor()
+                cur.executemany(_upsert_sql(self.RECORD_COLUMNS), list(batch.values()))
+                conn.commit()
+                cur.close()
+                self.flushes += 1
+                self.rows_flushed += len(batch)
+                return len(batch)
+            except Exception as e:
+                log.warning("Mirror of %s licenses failed: %s", len(batch), e)
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                self._merge_back(batch)
+                self.failures += 1
+                self.last_error = str(e)
+                return 0
+            finally:
+                if conn is not None:
+                    self.release_sqlite(conn)
+
+    def _last_snapshot_age(self, cur):
+        cur.execute("SELECT setting_value FROM system_settings WHERE setting_name=?", (SNAPSHOT_SETTING,))
+        row = cur.fetchone()
+        try:
+            return time.time() - float(row[0]) if row else None
+        except (TypeError, ValueError):
+            return None
+
+    def _is_fresh(self, cur):
+        age = self._last_snapshot_age(cur)
+        return age is not None and age < self.min_age
+
+    def _read_source(self):
+        """-> every license row from the source, or None when the source is not Postgres."""
+        conn, db_type = self.get_source()
+        if not conn:
+            raise RuntimeError("source database unavailable")
+        try:
+            if db_type != 'postgres':
+                return None
+            cur = conn.cursor()
+            cur.execute(f"SELECT {', '.join(COLUMNS)} FROM licenses")
+            rows = []
+            while True:
+                chunk = cur.fetchmany(self.batch_size)
+                if not chunk:
+                    break
+                rows.extend(tuple(_sqlite_value(v) for v in r) for r in chunk)
+            cur.close()
+            conn.rollback()
+            return rows
+        finally:
+            self.release_source(conn, db_type)
+
+    def snapshot(self, force=False):
+        """Full copy of the Postgres licenses into SQLite. Returns rows copied (0 when skipped)."""
+        with self._snapshot_lock:
+            started = time.perf_counter()
+            conn = self.get_sqlite()
+            try:
+                cur = conn.cursor()
+                if not force and self._is_fresh(cur):
+                    self.snapshots_skipped += 1
+                    return 0
+                rows = self._read_source()
+                if rows is None:
+                    return 0
+                conn.commit()
+                cur.execute("BEGIN IMMEDIATE")
+                # Re-check under the write lock: another worker may have just finished one
+                if not force and self._is_fresh(cur):
+                    conn.rollback()
+                    self.snapshots_skipped += 1
+                    return 0
+                for i in range(0, len(rows), self.batch_size):
+                    cur.executemany(_upsert_sql(COLUMNS), rows[i:i + self.batch_size])
+                cur.execute("INSERT INTO system_settings (setting_name, setting_value) VALUES (?, ?) "
+                            "ON CONFLICT(setting_name) DO UPDATE SET setting_value=excluded.setting_value",
+                            (SNAPSHOT_SETTING, str(time.time())))
+                conn.commit()
+                cur.close()
+                self.snapshots += 1
+                self.snapshot_rows = len(rows)
+                self.last_snapshot_ms = (time.perf_counter() - started) * 1000
+                self.last_error = None
+                log.info("License snapshot: %s rows mirrored in %.0f ms", len(rows), self.last_snapshot_ms)
+                return len(rows)
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                self.failures += 1
+                self.last_error = str(e)
+                log.warning("License snapshot failed: %s", e)
+                return 0
+            finally:
+                self.release_sqlite(conn)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failures": self.failures,
+            "snapshots": self.snapshots,
+            "snapshots_skipped": self.snapshots_skipped,
+            "snapshot_rows": self.snapshot_rows,
+            "last_snapshot_ms": round(self.last_snapshot_ms, 1),
+            "flush_interval": self.flush_interval,
+            "last_error": self.last_error,
+        }
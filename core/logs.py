@@ -0,0 +1,108 @@
+"""
+QUANTUM X PRO - Leveled, Non-Blocking Logging
+All application loggers live under the "qx" namespace. Records are handed to a
+bounded in-memory queue and written to stdout by a single listener thread, so
+request threads never block on stdout. The level comes from LOG_LEVEL
+(default WARNING); debug/info calls below it cost one level check.
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT = "qx"
+FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_lock = threading.Lock()
+_listener = None
+_handler = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level=None, maxsize=None):
+    """Idempotent. Installs the queue handler on the "qx" logger and starts the listener."""
+    global _listener, _handler
+    with _lock:
+        root = logging.getLogger(ROOT)
+        level = (level or os.environ.get("LOG_LEVEL", "WARNING")).upper()
+        root.setLevel(getattr(logging, level, logging.WARNING))
+        if _listener is not None:
+            return root
+        maxsize = maxsize or int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter(FORMAT))
+        _handler = DroppingQueueHandler(queue.Queue(maxsize=maxsize))
+        _listener = logging.handlers.QueueListener(_handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_handler)
+        root.propagate = False
+        return root
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def flush_logging():
+    """Writes out everything still queued (used on shutdown); logging keeps working afterwards."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener.start()
+
+
+class Throttle:
+    """
+    Rate-limits repetitive messages per key: at most one record per interval,
+    with the number of suppressed repeats appended to the next one that passes.
+    """
+
+    def __init__(self, interval=60.0, max_keys=1000):
+        self.interval = interval
+        self.max_keys = max_keys
+        self._seen = {}  # key -> [last_emit, suppressed]
+        self._lock = threading.Lock()
+
+    def log(self, logger, level, key, msg, *args):
+        if not logger.isEnabledFor(level):
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return
+            suppressed = entry[1] if entry else 0
+            if entry is None and len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = [now, 0]
+        if suppressed:
+            msg = f"{msg} (+{suppressed} similar suppressed)"
+        logger.log(level, msg, *args)
+
+
+def stats():
+    root = logging.getLogger(ROOT)
+    return {
+        "level": logging.getLevelName(root.getEffectiveLevel()),
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+    }
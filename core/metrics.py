@@ -0,0 +1,170 @@
+"""
+QUANTUM X PRO - Metrics Registry
+Counters, gauges and histograms rendered in the Prometheus text format for
+/metrics. Each metric keeps one small dict of label-tuple -> value and a lock
+held only for the increment itself (bucket search happens outside it).
+Gauges/counters can also be backed by a callback that is read at scrape time,
+so existing stats() sources cost nothing on the request path.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), func=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.func = func  # () -> number, or {label tuple: number}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(v) for v in labelvalues)
+
+    def samples(self):
+        if self.func is not None:
+            value = self.func()
+            items = value.items() if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [(self.name, _labels(self.labelnames, key), v) for key, v in items]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labelvalues):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labelvalues, amount=1):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labelvalues):
+        key = self._key(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)  # first bucket with le >= value
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # per-bucket (non-cumulative) counts + overflow, sum, count
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in self._values.items()]
+        out = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _number(float(bound)) + '"'
+                out.append((f"{self.name}_bucket", _labels(self.labelnames, key, le), cumulative))
+            out.append((f"{self.name}_sum", _labels(self.labelnames, key), total))
+            out.append((f"{self.name}_count", _labels(self.labelnames, key), count))
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=(), func=None):
+        return self._register(Counter(self.prefix + name, documentation, labelnames, func))
+
+    def gauge(self, name, documentation, labelnames=(), func=None):
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, func))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        chunks = []
+        for metric in metrics:
+            try:
+                chunks.append(metric.render())
+            except Exception as e:
+                # A broken callback must not take the whole scrape down
+                chunks.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(chunks) + "\n"
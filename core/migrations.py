@@ -0,0 +1,167 @@
+"""
+QUANTUM X PRO - Versioned Schema Migrations
+The schema is an ordered list of migrations, each recorded in schema_version
+once applied. A boot with an up-to-date database costs one SELECT; pending
+migrations run in order under a cross-process lock (Postgres advisory lock,
+flock()ed file for SQLite) so several workers booting at once apply each one
+exactly once. Steps may commit on their own, so every migration must be safe
+to re-run if the process dies before its version row is written.
+"""
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from core.logs import get_logger
+
+log = get_logger("migrations")
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: single process
+    fcntl = None
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INTEGER
+    )
+"""
+
+
+class Migration:
+    def __init__(self, version, name, apply):
+        """apply(conn, cur, db_type) -> None"""
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+
+class Migrator:
+    def __init__(self, migrations, get_conn, release_conn, lock_name="schema-migrations", lock_dir="."):
+        """get_conn() -> (conn, db_type); release_conn(conn, db_type)"""
+        versions = [m.version for m in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError("Migration versions must be unique and in ascending order")
+        self.migrations = list(migrations)
+        self.get_conn = get_conn
+        self.release_conn = release_conn
+        self.lock_key = zlib.crc32(lock_name.encode())
+        self.lock_path = os.path.join(lock_dir, f".{lock_name}.lock")
+        self.latest = versions[-1] if versions else 0
+        self._verified = {}  # db_type -> True once seen at latest in this process
+        self._lock = threading.Lock()
+        self.applied = 0
+        self.last_error = None
+
+    def _p(self, db_type):
+        return "%s" if db_type == "postgres" else "?"
+
+    def current_version(self, conn, cur, db_type):
+        """Highest applied version; 0 when schema_version does not exist yet."""
+        try:
+            cur.execute("SELECT MAX(version) FROM schema_version")
+            row = cur.fetchone()
+            return (row[0] if row else None) or 0
+        except Exception:
+            conn.rollback()
+            return 0
+
+    @contextmanager
+    def _exclusive(self, conn, cur, db_type):
+        if db_type == "postgres":
+            cur.execute("SELECT pg_advisory_lock(%s)", (self.lock_key,))
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.rollback()
+                cur.execute("SELECT pg_advisory_unlock(%s)", (self.lock_key,))
+                conn.commit()
+        elif fcntl is not None:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+        else:
+            yield
+
+    def pending(self, current):
+        return [m for m in self.migrations if m.version > current]
+
+    def migrate(self):
+        """Brings the database to the latest version. Returns the list of applied migration names."""
+        conn, db_type = self.get_conn()
+        if not conn:
+            return []
+        if self._verified.get(db_type):
+            self.release_conn(conn, db_type)
+            return []
+        applied = []
+        try:
+            cur = conn.cursor()
+            if self.current_version(conn, cur, db_type) < self.latest:
+                with self._lock, self._exclusive(conn, cur, db_type):
+                    applied = self._apply_pending(conn, cur, db_type)
+            self._verified[db_type] = True
+            self.last_error = None
+            cur.close()
+        except Exception as e:
+            self.last_error = str(e)
+            log.error("Migration failed: %s", e)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.release_conn(conn, db_type)
+        return applied
+
+    def _apply_pending(self, conn, cur, db_type):
+        cur.execute(SCHEMA_VERSION_DDL)
+        conn.commit()
+        applied = []
+        # Re-read under the lock: another worker may have migrated while we waited
+        for migration in self.pending(self.current_version(conn, cur, db_type)):
+            started = time.perf_counter()
+            log.warning("Applying schema migration %s: %s (%s)", migration.version, migration.name, db_type)
+            migration.apply(conn, cur, db_type)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            p = self._p(db_type)
+            cur.execute(f"INSERT INTO schema_version (version, name, duration_ms) VALUES ({p}, {p}, {p})",
+                        (migration.version, migration.name, duration_ms))
+            conn.commit()
+            self.applied += 1
+            applied.append(migration.name)
+        return applied
+
+    def status(self):
+        """-> (db_type, [(version, name, applied_at or None)]) for every known migration."""
+        conn, db_type = self.get_conn()
+        if not conn:
+            return db_type, []
+        try:
+            cur = conn.cursor()
+            applied = {}
+            if self.current_version(conn, cur, db_type):
+                cur.execute("SELECT version, applied_at FROM schema_version")
+                applied = {row[0]: row[1] for row in cur.fetchall()}
+            cur.close()
+        finally:
+            self.release_conn(conn, db_type)
+        return db_type, [(m.version, m.name, applied.get(m.version)) for m in self.migrations]
+
+    def stats(self):
+        return {
+            "latest": self.latest,
+            "verified": sorted(k for k, v in self._verified.items() if v),
+            "applied_this_process": self.applied,
+            "last_error": self.last_error,
+        }
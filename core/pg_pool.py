@@ -0,0 +1,182 @@
+"""
+QUANTUM X PRO - Thread-Safe Postgres Pool
+Replaces psycopg2's SimpleConnectionPool (not meant for threaded workers,
+fails instantly when exhausted). getconn() blocks up to acquire_timeout for
+a free connection and raises PoolTimeout after that, so a burst queues
+briefly instead of failing over to another database. Connections are opened
+lazily, pinged before reuse when they sat idle for ping_after seconds, and
+closed once older than max_lifetime so server-side timeouts and failovers
+never surface as errors in a request.
+"""
+import collections
+import threading
+import time
+
+from core.logs import get_logger
+
+log = get_logger("pg_pool")
+
+# psycopg2.extensions.TRANSACTION_STATUS_*
+_TX_IDLE = 0
+_TX_UNKNOWN = 4
+
+
+class PoolTimeout(Exception):
+    """No connection became free within acquire_timeout."""
+
+
+class PostgresPool:
+    def __init__(self, dsn, maxconn=40, acquire_timeout=5.0, max_lifetime=1800, ping_after=30,
+                 connect=None, observe_wait=None):
+        """connect() -> new DB-API connection (default psycopg2.connect(dsn)); observe_wait(seconds)"""
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+        self._connect = connect or self._psycopg2_connect
+        self.observe_wait = observe_wait
+        self._idle = collections.deque()  # (conn, created_at, last_used); LIFO keeps warm connections hot
+        self._created_at = {}  # id(conn) -> created_at, for connections currently handed out
+        self._opened = 0  # idle + in use + being opened
+        self._cond = threading.Condition()
+        self.acquires = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.ping_failures = 0
+        self.connect_errors = 0
+
+    def _psycopg2_connect(self):
+        import psycopg2
+        # Bound the TCP/auth handshake too, not just the wait for a free slot
+        return psycopg2.connect(self.dsn, connect_timeout=max(1, int(self.acquire_timeout)))
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def _usable(self, conn, created_at, last_used, now):
+        if getattr(conn, "closed", 0):
+            return False
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if self.ping_after is not None and now - last_used > self.ping_after:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchone()
+                cur.close()
+                conn.rollback()
+            except Exception:
+                with self._cond:
+                    self.ping_failures += 1
+                return False
+        return True
+
+    def getconn(self, timeout=None):
+        started = time.monotonic()
+        deadline = started + (self.acquire_timeout if timeout is None else timeout)
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._opened >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"no Postgres connection free within {deadline - started:.1f}s "
+                                          f"({self._opened}/{self.maxconn} in use)")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                else:
+                    conn, created_at, last_used = None, None, None
+                    self._opened += 1  # reserve the slot before connecting outside the lock
+
+            now = time.monotonic()
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self.connect_errors += 1
+                        self._cond.notify()
+                    raise
+                created_at = now
+                with self._cond:
+                    self.created += 1
+            elif not self._usable(conn, created_at, last_used, now):
+                with self._cond:
+                    self.recycled += 1
+                self._close(conn)
+                continue
+
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._created_at[id(conn)] = created_at
+                self.acquires += 1
+                if waited:
+                    self.waits += 1
+                    self.wait_seconds += elapsed
+            if self.observe_wait is not None:
+                self.observe_wait(elapsed)
+            return conn
+
+    def putconn(self, conn, close=False):
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), None)
+        if created_at is None:
+            log.warning("putconn() for a connection this pool did not hand out; closing it")
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        if not close and not getattr(conn, "closed", 0):
+            try:
+                status = conn.get_transaction_status()
+                if status == _TX_UNKNOWN:
+                    close = True  # connection is broken
+                elif status != _TX_IDLE:
+                    conn.rollback()  # never hand out a connection mid-transaction
+            except Exception:
+                close = True
+        if close or getattr(conn, "closed", 0):
+            self._close(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), collections.deque()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max": self.maxconn,
+                "open": self._opened,
+                "in_use": self._opened - idle,
+                "idle": idle,
+                "acquires": self.acquires,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 3),
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "recycled": self.recycled,
+                "ping_failures": self.ping_failures,
+                "connect_errors": self.connect_errors,
+            }
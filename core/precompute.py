@@ -0,0 +1,142 @@
+"""
+QUANTUM X PRO - Minute-Boundary Signal Precomputation
+Tracks which markets/timeframes users actually request and, a few seconds
+before each candle closes, warms the SignalCache for the upcoming minute so
+the boundary burst of /predict calls is served straight from memory.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.logs import get_logger
+
+log = get_logger("precompute")
+
+
+class SignalPrecomputer:
+    def __init__(self, signal_cache, compute_fn, lead_seconds=5, max_markets=20,
+                 demand_decay=0.8, min_demand=0.5, workers=4, should_compute=None):
+        """
+        compute_fn(market, timeframe, broker, timezone_name, minute_ts) -> signal or None
+        should_compute(market) -> bool lets the app skip closed markets.
+        """
+        self.cache = signal_cache
+        self.compute_fn = compute_fn
+        self.lead_seconds = lead_seconds
+        self.max_markets = max_markets
+        self.demand_decay = demand_decay
+        self.min_demand = min_demand
+        self.workers = workers
+        self.should_compute = should_compute
+        self._demand = {}  # (market, timeframe) -> {"score", "broker", "timezone", "last_seen"}
+        self._watched = {}  # (market, timeframe) -> {"count", "broker", "timezone"} from open streams
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.cycles = 0
+        self.precomputed = 0
+        self.empty = 0  # computed but nothing the cache keeps (no candles), so the boundary request fetches again
+        self.failures = 0
+        self.last_cycle_ms = 0.0
+
+    def record(self, market, timeframe, broker, timezone_name, source):
+        """Called by /predict for every served signal; source comes from SignalCache."""
+        with self._lock:
+            entry = self._demand.get((market, timeframe))
+            if entry is None:
+                entry = {"score": 0.0, "broker": broker, "timezone": timezone_name, "last_seen": 0}
+                self._demand[(market, timeframe)] = entry
+            entry["score"] += 1
+            entry["broker"] = broker or entry["broker"]
+            entry["timezone"] = timezone_name or entry["timezone"]
+            entry["last_seen"] = time.time()
+            self.requests += 1
+            if source == 'memory':
+                self.hits += 1
+
+    def watch(self, market, timeframe, broker, timezone_name):
+        """Pins a market while a push subscriber is listening for it."""
+        with self._lock:
+            entry = self._watched.setdefault((market, timeframe), {"count": 0, "broker": broker, "timezone": timezone_name})
+            entry["count"] += 1
+
+    def unwatch(self, market, timeframe):
+        with self._lock:
+            entry = self._watched.get((market, timeframe))
+            if entry:
+                entry["count"] -= 1
+                if entry["count"] <= 0:
+                    del self._watched[(market, timeframe)]
+
+    def tracked(self):
+        """Streamed markets first, then top markets by decayed request score."""
+        with self._lock:
+            pinned = [(k, {"score": float(v["count"]), "broker": v["broker"], "timezone": v["timezone"]})
+                      for k, v in self._watched.items()]
+            ranked = sorted(self._demand.items(), key=lambda kv: kv[1]["score"], reverse=True)
+            polled = [(k, dict(v)) for k, v in ranked
+                      if v["score"] >= self.min_demand and k not in self._watched]
+            return (pinned + polled)[:max(self.max_markets, len(pinned))]
+
+    def _decay(self):
+        with self._lock:
+            for key in list(self._demand):
+                self._demand[key]["score"] *= self.demand_decay
+                if self._demand[key]["score"] < self.min_demand / 10:
+                    del self._demand[key]
+
+    def run_cycle(self, minute_ts):
+        """Warms every tracked market for minute_ts in parallel."""
+        started = time.perf_counter()
+        targets = self.tracked()
+        if self.should_compute:
+            targets = [t for t in targets if self.should_compute(t[0][0])]
+
+        def _warm(item):
+            (market, timeframe), meta = item
+            try:
+                signal, _ = self.cache.get_or_compute(
+                    (market, timeframe, minute_ts),
+                    lambda: self.compute_fn(market, timeframe, meta["broker"], meta["timezone"], minute_ts)
+                )
+                return "warmed" if self.cache.is_cacheable(signal) else "empty"
+            except Exception as e:
+                log.warning("%s M%s failed: %s", market, timeframe, e)
+                return "failed"
+
+        if targets:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(targets))) as pool:
+                results = list(pool.map(_warm, targets))
+            with self._lock:
+                self.precomputed += results.count("warmed")
+                self.empty += results.count("empty")
+                self.failures += results.count("failed")
+
+        self._decay()
+        with self._lock:
+            self.cycles += 1
+            self.last_cycle_ms = (time.perf_counter() - started) * 1000
+
+    def run_next_cycle(self):
+        """Scheduled lead_seconds before each minute boundary: warms the minute about to start."""
+        self.run_cycle((int(time.time() / 60) + 1) * 60)
+
+    def stats(self):
+        tracked = self.tracked()
+        with self._lock:
+            return {
+                "tracked": [
+                    {"market": m, "timeframe": tf, "broker": meta["broker"], "score": round(meta["score"], 2)}
+                    for (m, tf), meta in tracked
+                ],
+                "requests": self.requests,
+                "cache_hits": self.hits,
+                "hit_ratio": round(self.hits / self.requests, 4) if self.requests else 0.0,
+                "cycles": self.cycles,
+                "precomputed": self.precomputed,
+                "empty": self.empty,
+                "failures": self.failures,
+                "last_cycle_ms": round(self.last_cycle_ms, 1),
+                "lead_seconds": self.lead_seconds,
+                "max_markets": self.max_markets,
+            }
@@ -0,0 +1,167 @@
+"""
+QUANTUM X PRO - Sliding-Window Rate Limiter
+Constant memory per bucket: each key keeps only the current and previous
+fixed-window counters, and the sliding estimate weights the previous window
+by how much of it still overlaps. O(1) per request, idle buckets evicted.
+With a shared backend (core.shared_state) every worker still decides locally;
+its own hits are pushed every sync_interval seconds in one batched write,
+which returns the totals of all workers. Between syncs another worker's hits
+are not seen yet, so a key can overshoot by what the others allow in that
+interval.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify
+
+from core.logs import get_logger
+
+log = get_logger("ratelimit")
+
+# Bucket slots
+WINDOW, OWN, OWN_PREV, OTHERS, OTHERS_PREV, SYNCED = range(6)
+
+
+class RateLimiter:
+    def __init__(self, name, limit, window, max_buckets=50000, shared=None, sync_interval=1.0):
+        self.name = name
+        self.shared = shared
+        self.limit = limit
+        self.window = window
+        self.max_buckets = max_buckets
+        self.sync_interval = sync_interval
+        # key -> [window_start, own, own_previous, others, others_previous, own_synced]
+        self._buckets = {}
+        self._pending = {}  # (key, window_start) -> hits not pushed to the shared backend yet
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sweep = time.time()
+        self._last_sync = time.time()
+        self.allowed = 0
+        self.rejected = 0
+        self.syncs = 0
+        self.sync_failures = 0
+        self.last_error = None
+
+    def hit(self, key, cost=1):
+        """Registers cost requests for key. Returns (allowed, retry_after_seconds)."""
+        now = time.time()
+        window_start = now - (now % self.window)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [window_start, 0, 0, 0, 0, 0]
+                self._buckets[key] = bucket
+            elif bucket[WINDOW] != window_start:
+                # Roll forward; anything older than one window contributes nothing
+                adjacent = window_start - bucket[WINDOW] == self.window
+                bucket[OWN_PREV] = bucket[OWN] if adjacent else 0
+                bucket[OTHERS_PREV] = bucket[OTHERS] if adjacent else 0
+                bucket[OWN] = bucket[OTHERS] = bucket[SYNCED] = 0
+                bucket[WINDOW] = window_start
+
+            overlap = 1.0 - (now - window_start) / self.window
+            estimated = bucket[OWN] + bucket[OTHERS] + (bucket[OWN_PREV] + bucket[OTHERS_PREV]) * overlap
+            if estimated + cost > self.limit:
+                self.rejected += 1
+                return False, max(1, int(window_start + self.window - now))
+
+            bucket[OWN] += cost
+            self.allowed += 1
+            if self.shared is not None:
+                pending_key = (key, window_start)
+                self._pending[pending_key] = self._pending.get(pending_key, 0) + cost
+            if now - self._last_sweep > self.window or len(self._buckets) > self.max_buckets:
+                self._sweep_locked(window_start)
+                self._last_sweep = now
+            due = self.shared is not None and now - self._last_sync >= self.sync_interval
+        if due:
+            self.sync()
+        return True, 0
+
+    def sync(self):
+        """Pushes this worker's pending hits and learns the other workers' counts. Skipped if one is running."""
+        if self.shared is None or not self._sync_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._last_sync = time.time()
+            if not batch:
+                return 0
+            namespace = f"ratelimit:{self.name}"
+            try:
+                totals = self.shared.incr_many(
+                    namespace, {f"{key}:{int(ws)}": cost for (key, ws), cost in batch.items()}, ttl=self.window * 2)
+            except Exception as e:
+                # Shared store unavailable (locked/corrupt): keep enforcing locally, retry next interval
+                with self._lock:
+                    for pending_key, cost in batch.items():
+                        self._pending[pending_key] = self._pending.get(pending_key, 0) + cost
+                    self.sync_failures += 1
+                    self.last_error = str(e)
+                log.warning("Rate limit sync for %s failed: %s", self.name, e)
+                return 0
+            with self._lock:
+                for (key, ws), cost in batch.items():
+                    bucket = self._buckets.get(key)
+                    if bucket is None:
+                        continue
+                    total = totals.get(f"{key}:{int(ws)}", 0)
+                    if bucket[WINDOW] == ws:
+                        bucket[SYNCED] += cost
+                        bucket[OTHERS] = max(0, total - bucket[SYNCED])
+                    elif bucket[WINDOW] - ws == self.window:
+                        bucket[OTHERS_PREV] = max(0, total - bucket[OWN_PREV])
+                self.syncs += 1
+            return len(batch)
+        finally:
+            self._sync_lock.release()
+
+    def _sweep_locked(self, window_start):
+        """Drops buckets idle for two windows; if still over budget, the oldest go."""
+        horizon = window_start - self.window
+        for key in [k for k, b in self._buckets.items() if b[WINDOW] < horizon]:
+            del self._buckets[key]
+        if len(self._buckets) > self.max_buckets:
+            oldest = sorted(self._buckets.items(), key=lambda kv: kv[1][WINDOW])
+            for key, _ in oldest[:len(self._buckets) - self.max_buckets]:
+                del self._buckets[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "window": self.window,
+                "buckets": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "shared": self.shared is not None,
+                "pending": len(self._pending),
+                "syncs": self.syncs,
+                "sync_failures": self.sync_failures,
+                "last_error": self.last_error,
+            }
+
+
+def rate_limited(limiter, key_func, cost_func=None):
+    """
+    Flask view decorator. key_func() returns the bucket key for the current
+    request (None skips limiting, e.g. malformed requests the view rejects anyway).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = key_func()
+            if key is not None:
+                cost = cost_func() if cost_func else 1
+                allowed, retry_after = limiter.hit(key, cost)
+                if not allowed:
+                    response = jsonify({"error": "Rate limit exceeded"})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
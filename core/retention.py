@@ -0,0 +1,162 @@
+"""
+QUANTUM X PRO - Retention & Compaction
+Background pruning for tables that otherwise grow forever:
+- signals_cache: only the current minute is ever read; stale rows are deleted in small batches.
+- win_rate_tracking: rows past the horizon are rolled into win_rate_daily summaries, then deleted.
+SQLite files are then shrunk with incremental_vacuum steps; on Postgres the small
+batches leave the work to autovacuum. The online job never runs a full VACUUM: a file
+created before auto_vacuum=INCREMENTAL is converted once, offline, by `migrate --vacuum`.
+"""
+import time
+
+from core.logs import get_logger
+
+log = get_logger("retention")
+
+
+class RetentionJob:
+    def __init__(self, get_conn, release_conn, signals_horizon=3600, tracking_days=30,
+                 batch_size=500, interval=600, vacuum_pages=2000, pause=0.05):
+        """get_conn() -> (conn, db_type); release_conn(conn, db_type)"""
+        self.get_conn = get_conn
+        self.release_conn = release_conn
+        self.signals_horizon = signals_horizon
+        self.tracking_days = tracking_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.vacuum_pages = vacuum_pages
+        self.pause = pause
+        self._warned_full = False
+        self.runs = 0
+        self.signals_deleted = 0
+        self.tracking_rolled = 0
+        self.last_run_ms = 0.0
+        self.last_error = None
+
+    def _sql(self, db_type, query):
+        return query if db_type == 'postgres' else query.replace('%s', '?')
+
+    def prune_signals(self, conn, cur, db_type):
+        cutoff = int(time.time()) - self.signals_horizon
+        if db_type == 'postgres':
+            query = "DELETE FROM signals_cache WHERE ctid IN (SELECT ctid FROM signals_cache WHERE timestamp < %s LIMIT %s)"
+        else:
+            query = "DELETE FROM signals_cache WHERE rowid IN (SELECT rowid FROM signals_cache WHERE timestamp < ? LIMIT ?)"
+        total = 0
+        while True:
+            cur.execute(query, (cutoff, self.batch_size))
+            deleted = cur.rowcount or 0
+            conn.commit()
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            time.sleep(self.pause)  # let request traffic take the write lock between batches
+        self.signals_deleted += total
+        return total
+
+    def roll_tracking(self, conn, cur, db_type):
+        if db_type == 'postgres':
+            cutoff_expr = f"CURRENT_TIMESTAMP - INTERVAL '{int(self.tracking_days)} days'"
+            day_expr = "CAST(created_at AS DATE)"
+        else:
+            cutoff_expr = f"datetime('now', '-{int(self.tracking_days)} days')"
+            day_expr = "date(created_at)"
+
+        total = 0
+        while True:
+            cur.execute(f"""
+                SELECT MIN(id), MAX(id), COUNT(*) FROM (
+                    SELECT id FROM win_rate_tracking WHERE created_at < {cutoff_expr} ORDER BY id LIMIT {int(self.batch_size)}
+                ) t
+            """)
+            lo, hi, count = cur.fetchone()
+            if not count:
+                break
+            cur.execute(self._sql(db_type, f"""
+                INSERT INTO win_rate_daily (day, market, broker, signals, wins, losses)
+                SELECT {day_expr}, COALESCE(market, ''), COALESCE(broker, ''), COUNT(*),
+                       SUM(CASE WHEN outcome = 'WIN' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN outcome = 'LOSS' THEN 1 ELSE 0 END)
+                FROM win_rate_tracking
+                WHERE id BETWEEN %s AND %s AND created_at < {cutoff_expr}
+                GROUP BY {day_expr}, COALESCE(market, ''), COALESCE(broker, '')
+                ON CONFLICT (day, market, broker) DO UPDATE SET
+                    signals = win_rate_daily.signals + excluded.signals,
+                    wins = win_rate_daily.wins + excluded.wins,
+                    losses = win_rate_daily.losses + excluded.losses
+            """), (lo, hi))
+            cur.execute(self._sql(db_type, f"DELETE FROM win_rate_tracking WHERE id BETWEEN %s AND %s AND created_at < {cutoff_expr}"), (lo, hi))
+            conn.commit()
+            total += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.pause)
+        self.tracking_rolled += total
+        return total
+
+    def compact(self, conn, cur, db_type):
+        """SQLite only: release up to vacuum_pages free pages; skipped until the file is incremental."""
+        if db_type != 'sqlite':
+            return
+        cur.execute("PRAGMA auto_vacuum")
+        if cur.fetchone()[0] != 2:
+            if not self._warned_full:
+                log.warning("auto_vacuum is not INCREMENTAL; free pages stay in the file until "
+                            "'flask --app app migrate --vacuum' is run")
+                self._warned_full = True
+            return
+        cur.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})")
+        cur.fetchall()
+
+    @staticmethod
+    def enable_incremental(conn):
+        """Offline, one-time: switch an existing SQLite file to incremental auto-vacuum.
+        The full VACUUM this needs holds an exclusive lock for the whole rebuild. Returns True if converted."""
+        cur = conn.cursor()
+        try:
+            cur.execute("PRAGMA auto_vacuum")
+            if cur.fetchone()[0] == 2:
+                return False
+            conn.commit()  # VACUUM cannot run inside a transaction
+            cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cur.execute("VACUUM")
+            return True
+        finally:
+            cur.close()
+
+    def run_once(self):
+        started = time.perf_counter()
+        conn, db_type = self.get_conn()
+        if not conn:
+            return
+        try:
+            cur = conn.cursor()
+            signals = self.prune_signals(conn, cur, db_type)
+            rolled = self.roll_tracking(conn, cur, db_type)
+            self.compact(conn, cur, db_type)
+            cur.close()
+            self.last_error = None
+            if signals or rolled:
+                log.info("Pruned %s cached signals, rolled up %s tracking rows", signals, rolled)
+        except Exception as e:
+            self.last_error = str(e)
+            log.error("Run failed: %s", e)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        finally:
+            self.release_conn(conn, db_type)
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "signals_deleted": self.signals_deleted,
+            "tracking_rolled_up": self.tracking_rolled,
+            "last_run_ms": round(self.last_run_ms, 1),
+            "last_error": self.last_error,
+            "signals_horizon_s": self.signals_horizon,
+            "tracking_days": self.tracking_days,
+        }
@@ -0,0 +1,226 @@
+"""
+QUANTUM X PRO - Background Scheduler
+One timer thread dispatches every periodic job (heartbeat, usage flush,
+retention, leader election, precompute, candle relay) to a small worker pool,
+and one-off work (broker connects, WebSocket bridges, pool warm-up) goes
+through a bounded task pool instead of a fresh thread per call. Workers are
+daemon threads spawned on demand up to the limit. Latency-critical jobs
+(the minute-aligned precompute) can get a dedicated worker so a slow
+maintenance job (retention VACUUM, snapshots) never delays them. A job that
+is still busy when its next tick comes due has that tick skipped instead of
+stacked, and a run longer than its interval is counted as an overrun.
+"""
+import heapq
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+
+from core.logs import Throttle, get_logger
+
+log = get_logger("scheduler")
+
+
+class WorkerPool:
+    """At most max_workers daemon threads fed from a bounded queue; submit() never blocks."""
+
+    def __init__(self, name, max_workers, max_pending):
+        self.name = name
+        self.max_workers = max_workers
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._idle = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+            spawn = self._idle == 0 and self._threads < self.max_workers
+            if spawn:
+                self._threads += 1
+                thread_name = f"qx-{self.name}-{self._threads}"
+        if spawn:
+            threading.Thread(target=self._work, name=thread_name, daemon=True).start()
+        return True
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            fn, args = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            try:
+                fn(*args)
+            except Exception as e:
+                log.error("Unhandled error in %s worker: %s", self.name, e)
+            with self._lock:
+                self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "threads": self._threads,
+                "max_workers": self.max_workers,
+                "busy": self._threads - self._idle,
+                "pending": self._queue.qsize(),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+class Job:
+    def __init__(self, name, fn, interval, jitter=0.0, should_run=None, align=False, lead=0.0, pool=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter  # extra random delay per tick, 0..jitter seconds
+        self.should_run = should_run  # () -> bool, checked before each run (e.g. leader only)
+        self.align = align  # ticks on wall-clock multiples of interval, lead seconds early
+        self.lead = lead
+        self.pool = pool  # dedicated WorkerPool, or None for the shared job pool
+        self.running = False
+        self.next_run = None
+        self.runs = 0
+        self.gated = 0
+        self.failures = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.total_s = 0.0
+        self.last_s = 0.0
+        self.max_s = 0.0
+        self.last_run = None
+        self.last_error = None
+
+    def next_after(self, now):
+        if self.align:
+            return (int((now + self.lead) // self.interval) + 1) * self.interval - self.lead
+        return now + self.interval + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def stats(self):
+        return {
+            "interval_s": self.interval,
+            "runs": self.runs,
+            "gated": self.gated,  # ticks where should_run() said no
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_ms": round(self.last_s * 1000, 1),
+            "avg_ms": round(self.total_s / self.runs * 1000, 1) if self.runs else 0.0,
+            "max_ms": round(self.max_s * 1000, 1),
+            "last_run": self.last_run,
+            "next_in_s": round(max(0.0, self.next_run - time.time()), 1) if self.next_run else None,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    def __init__(self, job_workers=4, task_workers=4, max_pending_tasks=64):
+        self.jobs = {}
+        self.job_pool = WorkerPool("job", job_workers, max_pending=256)
+        self.task_pool = WorkerPool("task", task_workers, max_pending=max_pending_tasks)
+        self._heap = []  # (due, seq, name)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._throttle = Throttle(60)
+        self._started = False
+
+    def every(self, name, interval, fn, jitter=0.0, initial_delay=None, should_run=None, align=False, lead=0.0,
+              dedicated=False):
+        """
+        Registers periodic job fn(); the first run is after initial_delay (default: one interval).
+        dedicated=True runs it on its own worker thread instead of the shared job pool.
+        """
+        with self._cond:
+            if name in self.jobs:
+                return self.jobs[name]
+            pool = WorkerPool(f"job-{name}", 1, max_pending=1) if dedicated else None
+            job = self.jobs[name] = Job(name, fn, interval, jitter, should_run, align, lead, pool)
+            now = time.time()
+            job.next_run = now + initial_delay if initial_delay is not None else job.next_after(now)
+            heapq.heappush(self._heap, (job.next_run, next(self._seq), name))
+            self._cond.notify()
+        return job
+
+    def submit(self, name, fn, *args):
+        """One-off task on the bounded task pool. False when the backlog is full (the task is dropped)."""
+        def _task():
+            try:
+                fn(*args)
+            except Exception as e:
+                self._throttle.log(log, logging.ERROR, f"task:{name}", "Task %s failed: %s", name, e)
+
+        if self.task_pool.submit(_task):
+            return True
+        self._throttle.log(log, logging.WARNING, "task-full", "Task backlog full, dropped %s", name)
+        return False
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.time():
+                    self._cond.wait(self._heap[0][0] - time.time() if self._heap else None)
+                due, _, name = heapq.heappop(self._heap)
+                job = self.jobs[name]
+                job.next_run = job.next_after(max(due, time.time()))
+                heapq.heappush(self._heap, (job.next_run, next(self._seq), name))
+                if job.running:
+                    job.skipped += 1
+                    self._throttle.log(log, logging.WARNING, f"busy:{name}", "Job %s still running, tick skipped", name)
+                    continue
+                job.running = True
+            if not (job.pool or self.job_pool).submit(self._run, job):
+                job.running = False
+
+    def _run(self, job):
+        try:
+            if job.should_run is not None and not job.should_run():
+                job.gated += 1
+                return
+            started = time.perf_counter()
+            try:
+                job.fn()
+                job.last_error = None
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e)
+                self._throttle.log(log, logging.ERROR, f"fail:{job.name}", "Job %s failed: %s", job.name, e)
+            elapsed = time.perf_counter() - started
+            job.runs += 1
+            job.total_s += elapsed
+            job.last_s = elapsed
+            job.max_s = max(job.max_s, elapsed)
+            job.last_run = time.time()
+            if elapsed > job.interval:
+                job.overruns += 1
+                self._throttle.log(log, logging.WARNING, f"slow:{job.name}", "Job %s took %.1fs (interval %ss)",
+                                   job.name, elapsed, job.interval)
+        finally:
+            job.running = False
+
+    def start(self):
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._loop, name="qx-scheduler", daemon=True).start()
+
+    def stats(self):
+        with self._cond:
+            jobs = {name: job.stats() for name, job in self.jobs.items()}
+            dedicated = {name: job.pool.stats() for name, job in self.jobs.items() if job.pool is not None}
+        return {"jobs": jobs, "job_pool": self.job_pool.stats(), "task_pool": self.task_pool.stats(),
+                "dedicated_pools": dedicated}
@@ -0,0 +1,316 @@
+"""
+QUANTUM X PRO - Shared Cross-Process State
+Caches and counters that must agree across gunicorn workers (license cache,
+rate-limit windows, engine learning stats) go through a SharedState backend
+instead of process memory. The bundled backend is a WAL-mode SQLite file on
+local disk - no external service - with per-thread persistent connections.
+Another backend (e.g. Redis) only needs to implement the same methods.
+"""
+import os
+import pickle
+import shlex
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from core.sqlite_pool import SQLitePool
+
+
+class SharedState(ABC):
+    """Interface. Values are arbitrary picklable objects; counters are integers."""
+
+    @abstractmethod
+    def get(self, namespace, key, default=None):
+        pass
+
+    @abstractmethod
+    def set(self, namespace, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    def delete(self, namespace, *keys):
+        pass
+
+    @abstractmethod
+    def incr(self, namespace, key, amount=1, ttl=None):
+        """Atomically adds amount (creating the counter at 0) and returns the new value."""
+
+    def incr_many(self, namespace, amounts, ttl=None):
+        """{key: amount} -> {key: new value}. Backends override this to batch into one write."""
+        return {key: self.incr(namespace, key, amount, ttl=ttl) for key, amount in amounts.items()}
+
+    @abstractmethod
+    def items(self, namespace, limit=1000):
+        """Live (key, value) pairs of a namespace."""
+
+    def stats(self):
+        return {}
+
+
+class SQLiteSharedState(SharedState):
+    def __init__(self, db_file, busy_timeout_ms=2000, sweep_interval=60):
+        self.db_file = db_file
+        self.sweep_interval = sweep_interval
+        self.pool = SQLitePool(db_file, busy_timeout_ms=busy_timeout_ms, cache_size_kb=4096,
+                               mmap_size=33554432, synchronous="NORMAL")
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.reads = 0
+        self.writes = 0
+        self.errors = 0
+        self.swept = 0
+        conn = self.pool.acquire()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shared_kv (
+                    ns TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB,
+                    num INTEGER,
+                    expires_at REAL,
+                    PRIMARY KEY (ns, key)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_shared_kv_expires ON shared_kv (expires_at)")
+            conn.commit()
+        finally:
+            self.pool.release(conn)
+
+    def _write(self, sql, params, fetch=None):
+        conn = self.pool.acquire()
+        try:
+            cur = conn.execute(sql, params)
+            row = cur.execute(*fetch).fetchone() if fetch else None
+            conn.commit()
+            with self._lock:
+                self.writes += 1
+            return row
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.pool.release(conn)
+            self._maybe_sweep()
+
+    def get(self, namespace, key, default=None):
+        conn = self.pool.acquire()
+        try:
+            row = conn.execute(
+                "SELECT value, num FROM shared_kv WHERE ns=? AND key=? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, str(key), time.time())).fetchone()
+        finally:
+            self.pool.release(conn)
+        with self._lock:
+            self.reads += 1
+        if row is None:
+            return default
+        value, num = row
+        return pickle.loads(value) if value is not None else num
+
+    def set(self, namespace, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._write("INSERT OR REPLACE INTO shared_kv (ns, key, value, num, expires_at) VALUES (?, ?, ?, NULL, ?)",
+                    (namespace, str(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at))
+
+    def delete(self, namespace, *keys):
+        if not keys:
+            return
+        marks = ",".join("?" * len(keys))
+        self._write(f"DELETE FROM shared_kv WHERE ns=? AND key IN ({marks})", (namespace, *[str(k) for k in keys]))
+
+    # An expired counter restarts from amount instead of adding to the stale value
+    _INCR_SQL = """
+        INSERT INTO shared_kv (ns, key, value, num, expires_at) VALUES (?, ?, NULL, ?, ?)
+        ON CONFLICT (ns, key) DO UPDATE SET
+            num = CASE WHEN shared_kv.expires_at IS NOT NULL AND shared_kv.expires_at <= ?
+                       THEN excluded.num ELSE COALESCE(shared_kv.num, 0) + excluded.num END,
+            expires_at = CASE WHEN shared_kv.expires_at IS NOT NULL AND shared_kv.expires_at <= ?
+                              THEN excluded.expires_at ELSE shared_kv.expires_at END
+    """
+
+    def incr(self, namespace, key, amount=1, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        row = self._write(self._INCR_SQL, (namespace, str(key), amount, expires_at, now, now),
+                          fetch=("SELECT num FROM shared_kv WHERE ns=? AND key=?", (namespace, str(key))))
+        return row[0] if row else amount
+
+    def incr_many(self, namespace, amounts, ttl=None):
+        """All counters in one transaction instead of one commit per key."""
+        if not amounts:
+            return {}
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        keys = [str(k) for k in amounts]
+        conn = self.pool.acquire()
+        try:
+            conn.executemany(self._INCR_SQL, [(namespace, str(k), a, expires_at, now, now) for k, a in amounts.items()])
+            totals = {}
+            for i in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+                chunk = keys[i:i + 500]
+                totals.update(conn.execute(
+                    f"SELECT key, num FROM shared_kv WHERE ns=? AND key IN ({','.join('?' * len(chunk))})",
+                    (namespace, *chunk)).fetchall())
+            conn.commit()
+            with self._lock:
+                self.writes += 1
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.pool.release(conn)
+            self._maybe_sweep()
+        return {key: totals.get(str(key), amount) for key, amount in amounts.items()}
+
+    def items(self, namespace, limit=1000):
+        conn = self.pool.acquire()
+        try:
+            rows = conn.execute(
+                "SELECT key, value, num FROM shared_kv WHERE ns=? AND (expires_at IS NULL OR expires_at > ?) LIMIT ?",
+                (namespace, time.time(), int(limit))).fetchall()
+        finally:
+            self.pool.release(conn)
+        with self._lock:
+            self.reads += 1
+        return [(key, pickle.loads(value) if value is not None else num) for key, value, num in rows]
+
+    def _maybe_sweep(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        conn = self.pool.acquire()
+        try:
+            cur = conn.execute("DELETE FROM shared_kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            conn.commit()
+            with self._lock:
+                self.swept += cur.rowcount or 0
+        except Exception:
+            conn.rollback()  # busy: another worker is sweeping or writing; next interval retries
+        finally:
+            self.pool.release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "file": self.db_file,
+                "reads": self.reads,
+                "writes": self.writes,
+                "errors": self.errors,
+                "expired_swept": self.swept,
+            }
+
+
+def _gunicorn_value(args, name, short=None):
+    """Option value (e.g. --workers/-w) from a gunicorn command line; None when not given there"""
+    value = None
+    for i, arg in enumerate(args):
+        if arg in (name, short) and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith(name + "="):
+            value = arg.split("=", 1)[1]
+        elif short and arg.startswith(short) and len(arg) > len(short) and not arg.startswith("--"):
+            value = arg[len(short):]
+    return value
+
+
+def _gunicorn_option(args, name, short=None):
+    value = _gunicorn_value(args, name, short)
+    return int(value) if value and value.isdigit() else None
+
+
+def _gunicorn_args(argv, environ):
+    """gunicorn's arguments, or None when this is not gunicorn (also matches python -m gunicorn)"""
+    if not argv or "gunicorn" not in argv[0]:
+        return None
+    # Command-line flags override GUNICORN_CMD_ARGS, and the last occurrence wins
+    return shlex.split(environ.get("GUNICORN_CMD_ARGS", "")) + list(argv[1:])
+
+
+def detect_worker_processes(argv=None, environ=None):
+    """
+    Number of worker processes serving the app, or None when the server does
+    not tell (Passenger, a gunicorn config file, uWSGI). Callers should treat
+    None as more than one.
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    program = os.path.basename(argv[0]) if argv else ""
+    args = _gunicorn_args(argv, environ)
+    if args is not None:
+        workers = _gunicorn_option(args, "--workers", "-w")
+        if workers is not None:
+            return workers
+        if any(a in ("-c", "--config") or a.startswith("--config=") for a in args) or os.path.exists("gunicorn.conf.py"):
+            return None
+        return int(environ.get("WEB_CONCURRENCY") or 1)  # gunicorn's own default
+    if environ.get("WEB_CONCURRENCY"):
+        return int(environ["WEB_CONCURRENCY"])
+    if environ.get("PASSENGER_APP_ENV") or environ.get("IN_PASSENGER") or "passenger" in program.lower():
+        return None
+    if program in ("app.py", "flask"):
+        return 1  # python app.py / flask run: one process
+    return None
+
+
+def detect_worker_class(argv=None, environ=None):
+    """gunicorn worker class ('sync', 'gthread', 'gevent', 'eventlet', ...); None when not gunicorn"""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    args = _gunicorn_args(argv, environ)
+    if args is None:
+        return None
+    worker_class = (_gunicorn_value(args, "--worker-class", "-k") or "").lower()
+    for name in ("gthread", "gevent", "eventlet", "tornado"):
+        if name in worker_class:  # also the dotted paths, e.g. gunicorn.workers.ggevent.GeventWorker
+            return name
+    if worker_class:
+        return worker_class
+    threads = _gunicorn_option(args, "--threads")
+    return "gthread" if threads and threads > 1 else "sync"
+
+
+def detect_worker_threads(argv=None, environ=None):
+    """
+    Concurrent requests per worker process: --threads from the gunicorn
+    command line (--worker-connections for gevent/eventlet workers, default
+    1000), else WEB_THREADS, else 1 (the gunicorn and Passenger default).
+    None for the development server, which starts a thread per request.
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    args = _gunicorn_args(argv, environ)
+    if args is not None:
+        if detect_worker_class(argv, environ) in ("gevent", "eventlet"):
+            return _gunicorn_option(args, "--worker-connections") or 1000
+        threads = _gunicorn_option(args, "--threads")
+        if threads is not None:
+            return threads
+    if environ.get("WEB_THREADS"):
+        return int(environ["WEB_THREADS"])
+    if args is None and argv and os.path.basename(argv[0]) in ("app.py", "flask"):
+        return None
+    return 1
+
+
+def create_shared_state(backend, db_file="shared_state.db"):
+    """'memory' -> None (each consumer keeps its in-process state); 'sqlite' -> SQLiteSharedState."""
+    backend = (backend or "memory").lower()
+    if backend == "memory":
+        return None
+    if backend == "sqlite":
+        return SQLiteSharedState(db_file)
+    raise ValueError(f"Unknown shared state backend: {backend}")
@@ -0,0 +1,166 @@
+"""
+QUANTUM X PRO - Global Signal Cache (In-Process)
+Time-locked signal store keyed by (market, timeframe, minute).
+Concurrent misses for the same key are collapsed into a single computation
+(single-flight); every other caller waits on that result instead of running
+its own candle fetch + engine pass. The DB signals_cache table stays the
+cross-process backstop and is consulted from inside the compute function.
+Each entry can also carry pre-encoded response bodies (one per variant of
+the per-user fields), so repeat requests in the minute skip building and
+encoding the payload; they are dropped with the entry.
+"""
+import threading
+
+from core.logs import get_logger
+
+log = get_logger("signal_cache")
+
+
+class _Flight:
+    """One in-progress computation that late callers can wait on."""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SignalCache:
+    def __init__(self, retention_seconds=120, wait_timeout=30, max_body_variants=64, cacheable=None):
+        """cacheable(signal) -> bool decides whether a computed signal is kept for the minute (default: any)"""
+        self._entries = {}   # (market, timeframe, minute_ts) -> signal dict
+        self._inflight = {}  # (market, timeframe, minute_ts) -> _Flight
+        self._bodies = {}  # (market, timeframe, minute_ts) -> {variant: encoded response body}
+        self._lock = threading.Lock()
+        self._listeners = []  # fn(key, signal) called whenever a new minute signal lands
+        self.retention_seconds = retention_seconds
+        self.wait_timeout = wait_timeout
+        self.max_body_variants = max_body_variants  # per entry; variants come from client input
+        self.cacheable = cacheable
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.body_hits = 0
+        self.body_builds = 0
+        self.uncached = 0
+
+    def is_cacheable(self, value):
+        """Whether a computed signal would be kept for the minute"""
+        return value is not None and (self.cacheable is None or self.cacheable(value))
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def _notify(self, key, value):
+        for fn in self._listeners:
+            try:
+                fn(key, value)
+            except Exception as e:
+                log.error("Listener error: %s", e)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.is_cacheable(value):
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._bodies.pop(key, None)
+            self._evict_locked(key[2])
+        self._notify(key, value)
+
+    def _evict_locked(self, current_ts):
+        """Drops minutes that can never be served again."""
+        horizon = current_ts - self.retention_seconds
+        stale = [k for k in self._entries if k[2] < horizon]
+        for k in stale:
+            del self._entries[k]
+        for k in [k for k in self._bodies if k[2] < horizon]:
+            del self._bodies[k]
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns (signal, source) where source is 'memory', 'wait' or 'compute'.
+        compute() may return None (e.g. no market data); None and results the
+        cacheable predicate rejects are handed to the callers already waiting
+        but not cached, so the next request for the minute recomputes.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self.hits += 1
+                return value, 'memory'
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                return None, 'wait'
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, 'wait'
+
+        try:
+            flight.value = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            cached = self.is_cacheable(flight.value)
+            with self._lock:
+                if cached:
+                    self._entries[key] = flight.value
+                    self._evict_locked(key[2])
+                elif flight.value is not None:
+                    self.uncached += 1
+                self._inflight.pop(key, None)
+            flight.event.set()
+        if cached:
+            self._notify(key, flight.value)
+        return flight.value, 'compute'
+
+    def body(self, key, signal, variant, build):
+        """
+        Encoded response for one variant (the per-user fields) of signal, the
+        value cached at key. build() -> bytes runs on the first request per
+        variant; bodies are only kept while signal is the cached value.
+        """
+        with self._lock:
+            body = self._bodies.get(key, {}).get(variant)
+            if body is not None:
+                self.body_hits += 1
+                return body
+        body = build()
+        with self._lock:
+            self.body_builds += 1
+            if self._entries.get(key) is signal:
+                bodies = self._bodies.setdefault(key, {})
+                if len(bodies) < self.max_body_variants:
+                    bodies[variant] = body
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "uncached": self.uncached,
+                "bodies": sum(len(v) for v in self._bodies.values()),
+                "body_hits": self.body_hits,
+                "body_builds": self.body_builds,
+            }
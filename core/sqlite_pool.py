@@ -0,0 +1,139 @@
+"""
+QUANTUM X PRO - Persistent SQLite Connections
+One long-lived connection per thread (gthread workers, background services)
+opened once with WAL journaling and tuned pragmas, instead of a fresh
+sqlite3.connect() + close() per request. WAL lets readers proceed while the
+write-behind thread commits.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLitePool:
+    def __init__(self, db_file, busy_timeout_ms=5000, cache_size_kb=16384, mmap_size=134217728,
+                 synchronous="NORMAL", auto_vacuum=None):
+        self.db_file = db_file
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.synchronous = synchronous
+        self.auto_vacuum = auto_vacuum  # only takes effect on a new file; existing ones need a VACUUM
+        self._local = threading.local()
+        self._conns = {}  # thread ident -> connection, so dead threads' connections get closed
+        self._lock = threading.Lock()
+        self.journal_mode = None
+        self.created = 0
+        self.acquires = 0
+        self.reuses = 0
+        self.resets = 0
+        self.errors = 0
+        self.connect_ms = 0.0
+
+    def _connect(self):
+        started = time.perf_counter()
+        db_dir = os.path.dirname(self.db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout_ms / 1000.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        if self.auto_vacuum:
+            cur.execute(f"PRAGMA auto_vacuum={self.auto_vacuum}")  # before the first table is created
+        mode = cur.execute("PRAGMA journal_mode=WAL").fetchone()
+        cur.execute(f"PRAGMA synchronous={self.synchronous}")
+        cur.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        cur.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        cur.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.close()
+        with self._lock:
+            self.journal_mode = mode[0] if mode else None
+            self.created += 1
+            self.connect_ms += (time.perf_counter() - started) * 1000
+            self._reap_locked()
+            stale = self._conns.get(threading.get_ident())
+            if stale is not None:
+                # Thread ident reused by a new thread; the old owner is gone
+                try:
+                    stale.close()
+                except Exception:
+                    pass
+            self._conns[threading.get_ident()] = conn
+        return conn
+
+    def _reap_locked(self):
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._conns if i not in alive]:
+            try:
+                self._conns.pop(ident).close()
+            except Exception:
+                pass
+
+    def acquire(self):
+        """Returns this thread's connection. Nested acquires share it."""
+        conn = getattr(self._local, "conn", None)
+        with self._lock:
+            self.acquires += 1
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            self._local.conn = conn
+            self._local.depth = 0
+        else:
+            with self._lock:
+                self.reuses += 1
+        self._local.depth += 1
+        return conn
+
+    def release(self, conn):
+        """Keeps the connection open; rolls back anything left uncommitted by the outermost user."""
+        if conn is not getattr(self._local, "conn", None):
+            # Not ours (e.g. handed across threads) - don't keep it
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        self._local.depth = max(0, self._local.depth - 1)
+        if self._local.depth == 0 and conn.in_transaction:
+            try:
+                conn.rollback()
+            except Exception:
+                self.discard()
+                return
+            with self._lock:
+                self.resets += 1
+
+    def discard(self):
+        """Closes this thread's connection (after a fatal error); the next acquire reconnects."""
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        self._local.depth = 0
+        with self._lock:
+            self._conns.pop(threading.get_ident(), None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            self._reap_locked()
+            return {
+                "journal_mode": self.journal_mode,
+                "live_connections": len(self._conns),
+                "created": self.created,
+                "acquires": self.acquires,
+                "reuses": self.reuses,
+                "rollbacks_on_release": self.resets,
+                "errors": self.errors,
+                "avg_connect_ms": round(self.connect_ms / self.created, 2) if self.created else 0.0,
+                "busy_timeout_ms": self.busy_timeout_ms,
+            }
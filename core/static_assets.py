@@ -0,0 +1,197 @@
+"""
+QUANTUM X PRO - Precompressed Static Assets
+The frontend files (index.html, quantum_telemetry.js, LOGO/) are read once,
+compressed with gzip (and brotli when the module is installed) and kept in
+memory with a strong ETag per encoding. Requests get the best encoding the
+client accepts, and a matching If-None-Match gets a 304 with no body. A file
+is re-read when its mtime or size changes on disk. Only files under the
+configured paths are served.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from core.logs import get_logger
+
+log = get_logger("static")
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Already compressed formats gain nothing from another pass
+INCOMPRESSIBLE = {"image/png", "image/jpeg", "image/gif", "image/webp", "font/woff", "font/woff2"}
+# Server preference when the client accepts several encodings with the same q-value
+PREFERENCE = ("br", "gzip", "identity")
+
+
+def _compress(data, encoding):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding -> {coding: q}; '*' is kept as a coding"""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, available):
+    """Best coding in available for an Accept-Encoding header; None when even identity is refused."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*")
+    best, best_q = None, 0.0
+    for coding in PREFERENCE:
+        if coding not in available:
+            continue
+        q = accepted.get(coding)
+        if q is None:
+            # identity is acceptable unless refused explicitly or via *;q=0
+            q = wildcard if wildcard is not None else (1.0 if coding == "identity" else 0.0)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class StaticAsset:
+    __slots__ = ("path", "content_type", "mtime", "size", "bodies", "etags")
+
+    def __init__(self, path, content_type, mtime, size, bodies, etags):
+        self.path = path
+        self.content_type = content_type
+        self.mtime = mtime
+        self.size = size
+        self.bodies = bodies  # encoding -> bytes
+        self.etags = etags  # encoding -> quoted strong ETag
+
+
+class StaticAssets:
+    def __init__(self, root, paths, min_size=256, min_saving=0.1):
+        """paths: files or directories ('LOGO/') relative to root that may be served"""
+        self.root = os.path.abspath(root)
+        self.paths = [p.strip("/") for p in paths]
+        self.min_size = min_size
+        self.min_saving = min_saving
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._assets = {}  # relative path -> StaticAsset
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.not_modified = 0
+        self.served = {}  # encoding -> responses
+
+    def allowed(self, rel):
+        return any(rel == p or rel.startswith(p + "/") for p in self.paths)
+
+    def _resolve(self, rel):
+        full = os.path.abspath(os.path.join(self.root, rel.strip("/")))
+        if not full.startswith(self.root + os.sep):
+            return None, None
+        rel = os.path.relpath(full, self.root).replace(os.sep, "/")  # '..' collapsed before the allow check
+        if not self.allowed(rel):
+            return None, None
+        return rel, full
+
+    def _build(self, rel, full, st):
+        with open(full, "rb") as f:
+            data = f.read()
+        content_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+            content_type += "; charset=utf-8"
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        bodies = {"identity": data}
+        if len(data) >= self.min_size and content_type.split(";")[0] not in INCOMPRESSIBLE:
+            for encoding in self.encodings:
+                body = _compress(data, encoding)
+                if len(body) <= len(data) * (1 - self.min_saving):
+                    bodies[encoding] = body
+        # A strong ETag names one representation, so each encoding gets its own
+        etags = {enc: f'"{digest}"' if enc == "identity" else f'"{digest}-{enc}"' for enc in bodies}
+        with self._lock:
+            self.loads += 1
+        log.debug("Loaded %s: %s", rel, ", ".join(f"{enc} {len(b)}B" for enc, b in bodies.items()))
+        return StaticAsset(rel, content_type, st.st_mtime_ns, st.st_size, bodies, etags)
+
+    def get(self, rel):
+        """-> StaticAsset, or None when the path is not servable or does not exist"""
+        rel, full = self._resolve(rel)
+        if rel is None:
+            return None
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        if not os.path.isfile(full):
+            return None
+        asset = self._assets.get(rel)
+        if asset is None or asset.mtime != st.st_mtime_ns or asset.size != st.st_size:
+            asset = self._build(rel, full, st)
+            with self._lock:
+                self._assets[rel] = asset
+        return asset
+
+    def files(self):
+        for p in self.paths:
+            full = os.path.join(self.root, p)
+            if os.path.isdir(full):
+                for dirpath, _, names in os.walk(full):
+                    for name in sorted(names):
+                        yield os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+            elif os.path.isfile(full):
+                yield p
+
+    def preload(self):
+        """Reads and compresses every servable file (called once at startup)."""
+        count = 0
+        for rel in self.files():
+            try:
+                if self.get(rel) is not None:
+                    count += 1
+            except Exception as e:
+                log.warning("Preload of %s failed: %s", rel, e)
+        log.info("Precompressed %s static assets (%s)", count, ", ".join(self.encodings))
+        return count
+
+    def select(self, asset, accept_encoding, if_none_match):
+        """-> (encoding, not_modified) for one request; encoding None means 406."""
+        encoding = negotiate(accept_encoding, asset.bodies)
+        if encoding is None:
+            return None, False
+        etag = asset.etags[encoding]
+        not_modified = bool(if_none_match) and (
+            if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")])
+        with self._lock:
+            if not_modified:
+                self.not_modified += 1
+            self.served[encoding] = self.served.get(encoding, 0) + 1
+        return encoding, not_modified
+
+    def stats(self):
+        with self._lock:
+            assets = list(self._assets.values())
+            return {
+                "assets": len(assets),
+                "encodings": list(self.encodings),
+                "identity_bytes": sum(len(a.bodies["identity"]) for a in assets),
+                "compressed_bytes": {enc: sum(len(a.bodies[enc]) for a in assets if enc in a.bodies) for enc in self.encodings},
+                "loads": self.loads,
+                "served": dict(self.served),
+                "not_modified": self.not_modified,
+            }
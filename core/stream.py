@@ -0,0 +1,97 @@
+"""
+QUANTUM X PRO - Signal Push Stream (Server-Sent Events)
+One fan-out per market: when a minute signal lands in the SignalCache it is
+pushed to every subscriber of that market/timeframe instead of each
+dashboard polling /predict.
+"""
+import json
+import queue
+import threading
+
+
+class Subscription:
+    def __init__(self, keys, broker, max_pending=32):
+        self.keys = set(keys)  # {(market, timeframe)}
+        self.broker = broker
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Slow client: drop the oldest pending signal, keep the newest
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                pass
+
+
+class SignalBroadcaster:
+    def __init__(self, max_clients=500):
+        self.max_clients = max_clients
+        self._subs = {}  # (market, timeframe) -> set(Subscription)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, keys, broker):
+        """Returns a Subscription, or None when the server is at capacity."""
+        with self._lock:
+            if self._count >= self.max_clients:
+                return None
+            sub = Subscription(keys, broker)
+            for key in sub.keys:
+                self._subs.setdefault(key, set()).add(sub)
+            self._count += 1
+            return sub
+
+    def unsubscribe(self, sub):
+        """Safe to call more than once; only the first call frees the slot."""
+        with self._lock:
+            if sub.closed:
+                return False
+            sub.closed = True
+            for key in sub.keys:
+                subs = self._subs.get(key)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subs[key]
+            self._count -= 1
+            return True
+
+    def publish(self, cache_key, signal):
+        """SignalCache listener: cache_key is (market, timeframe, minute_ts)."""
+        market, timeframe, minute_ts = cache_key
+        with self._lock:
+            targets = list(self._subs.get((market, timeframe), ()))
+        if not targets:
+            return
+        event = dict(signal, market=market, timeframe=timeframe, timestamp=minute_ts)
+        for sub in targets:
+            sub.offer(event)
+        with self._lock:
+            self.published += 1
+            self.delivered += len(targets)
+
+    @staticmethod
+    def format_event(payload, event="signal"):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": self._count,
+                "max_clients": self.max_clients,
+                "markets": len(self._subs),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
@@ -0,0 +1,115 @@
+"""
+QUANTUM X PRO - Coalesced License Usage Counters
+Logins only bump usage_count / last_access_date / ip_address in memory; a
+periodic flush applies all pending increments as one bulk UPDATE, so a login
+storm costs one write per flush instead of one row-level write per request.
+"""
+import datetime
+import threading
+
+from core.logs import get_logger
+
+log = get_logger("usage")
+
+
+class UsageAccumulator:
+    def __init__(self, get_conn, release_conn, flush_interval=15):
+        """get_conn() -> (conn, db_type); release_conn(conn, db_type)"""
+        self.get_conn = get_conn
+        self.release_conn = release_conn
+        self.flush_interval = flush_interval
+        self._pending = {}  # key_code -> [count, last_access_utc, ip_address]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+
+    def record(self, key_code, ip_address=None):
+        if not key_code:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0, tzinfo=None)  # naive UTC, like the stored column
+        with self._lock:
+            entry = self._pending.get(key_code)
+            if entry is None:
+                self._pending[key_code] = [1, now, ip_address]
+            else:
+                entry[0] += 1
+                entry[1] = now
+                if ip_address:
+                    entry[2] = ip_address
+            self.recorded += 1
+
+    def _merge_back(self, batch):
+        """Failed flushes are retried next cycle instead of losing counts."""
+        with self._lock:
+            for key_code, (count, last_access, ip) in batch.items():
+                entry = self._pending.get(key_code)
+                if entry is None:
+                    self._pending[key_code] = [count, last_access, ip]
+                else:
+                    entry[0] += count
+                    entry[1] = max(entry[1], last_access)
+                    entry[2] = entry[2] or ip
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            conn, db_type = self.get_conn()
+            if not conn:
+                self._merge_back(batch)
+                self.failures += 1
+                return 0
+            try:
+                cur = conn.cursor()
+                if db_type == 'postgres':
+                    from psycopg2.extras import execute_values
+                    execute_values(cur, """
+                        UPDATE licenses AS l SET
+                            usage_count = COALESCE(l.usage_count, 0) + v.cnt,
+                            last_access_date = v.ts,
+                            ip_address = COALESCE(v.ip, l.ip_address)
+                        FROM (VALUES %s) AS v(key_code, cnt, ts, ip)
+                        WHERE l.key_code = v.key_code
+                    """, [(k, c, ts, ip) for k, (c, ts, ip) in batch.items()],
+                        template="(%s, %s::integer, %s::timestamp, %s::text)")
+                else:
+                    cur.executemany("""
+                        UPDATE licenses SET
+                            usage_count = COALESCE(usage_count, 0) + ?,
+                            last_access_date = ?,
+                            ip_address = COALESCE(?, ip_address)
+                        WHERE key_code = ?
+                    """, [(c, ts.strftime("%Y-%m-%d %H:%M:%S"), ip, k) for k, (c, ts, ip) in batch.items()])
+                conn.commit()
+                cur.close()
+                self.flushes += 1
+                self.rows_flushed += len(batch)
+                return len(batch)
+            except Exception as e:
+                log.error("Flush of %s licenses failed: %s", len(batch), e)
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                self._merge_back(batch)
+                self.failures += 1
+                return 0
+            finally:
+                self.release_conn(conn, db_type)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending_keys": len(self._pending),
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "rows_flushed": self.rows_flushed,
+                "failures": self.failures,
+                "flush_interval": self.flush_interval,
+            }
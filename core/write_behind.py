@@ -0,0 +1,162 @@
+"""
+QUANTUM X PRO - Group-Commit Write-Behind Queue
+Non-critical DB writes (tracking rows, telemetry counters) are queued by the
+request path and applied in the background: up to batch_size tasks or
+max_latency_ms are drained at once, grouped by statement and written with
+executemany() in a single transaction on a reused connection.
+"""
+import queue
+import threading
+import time
+
+from core.logs import get_logger
+
+log = get_logger("write_behind")
+
+
+class WriteBehindWriter:
+    def __init__(self, get_conn, release_conn, batch_size=200, max_latency_ms=250, maxsize=20000):
+        """get_conn() -> (conn, db_type); release_conn(conn, db_type)"""
+        self.get_conn = get_conn
+        self.release_conn = release_conn
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._conn = None
+        self._db_type = None
+        self._sqlite_sql = {}  # '%s' statement -> '?' statement (converted once)
+        self._lock = threading.Lock()
+        self._started = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    def put(self, query, params):
+        """Non-blocking enqueue; when the queue is full the write is dropped and counted."""
+        try:
+            self.queue.put_nowait({'query': query, 'params': params})
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.time() + self.max_latency
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                task = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if not task:
+                self.queue.put_nowait(task)  # keep the stop sentinel for the loop
+                break
+            batch.append(task)
+        return batch
+
+    def _ensure_conn(self):
+        if self._conn is None:
+            self._conn, self._db_type = self.get_conn()
+        return self._conn
+
+    def _drop_conn(self):
+        if self._conn is not None:
+            try:
+                self.release_conn(self._conn, self._db_type)
+            except Exception:
+                pass
+        self._conn, self._db_type = None, None
+
+    def _statement(self, query):
+        if self._db_type == 'postgres':
+            return query
+        sql = self._sqlite_sql.get(query)
+        if sql is None:
+            sql = self._sqlite_sql[query] = query.replace('%s', '?')
+        return sql
+
+    def write_batch(self, batch):
+        started = time.perf_counter()
+        groups = {}  # statement -> [params]; dict keeps first-seen order
+        for task in batch:
+            groups.setdefault(task['query'], []).append(task['params'])
+
+        with self._lock:
+            conn = self._ensure_conn()
+            if not conn:
+                self.failed += len(batch)
+                log.error("No DB connection, dropped %s writes", len(batch))
+                return
+            try:
+                cur = conn.cursor()
+                for query, rows in groups.items():
+                    cur.executemany(self._statement(query), rows)
+                conn.commit()
+                cur.close()
+                self.written += len(batch)
+            except Exception as e:
+                log.error("Batch of %s failed: %s", len(batch), e)
+                self.failed += len(batch)
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                self._drop_conn()
+            self.batches += 1
+            self.last_batch_size = len(batch)
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+
+    def run(self):
+        while True:
+            try:
+                task = self.queue.get(timeout=5)
+                if not task: break
+                self.write_batch(self._collect(task))
+            except queue.Empty:
+                continue
+            except Exception as e:
+                log.error("Error: %s", e)
+        self.drain()
+
+    def drain(self):
+        """Writes everything still queued (used on shutdown)."""
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    task = self.queue.get_nowait()
+                    if task:
+                        batch.append(task)
+            except queue.Empty:
+                pass
+            if not batch:
+                break
+            self.write_batch(batch)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stats(self):
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+        }
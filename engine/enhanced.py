@@ -9,10 +9,20 @@ import random
 import math
 
 class EnhancedEngine:
-    def __init__(self):
+    def __init__(self, shared=None):
         self.signal_history = []
         self.asset_stats = {} # {market: {"wins": 0, "losses": 0}}
         self.blacklisted_sequences = set()
+        self.shared = shared # Optional core.shared_state backend: win/loss stats shared by all workers
+
+    def _market_stats(self, market):
+        if self.shared is not None:
+            try:
+                return {"w": self.shared.get("engine_stats", f"{market}:w", 0),
+                        "l": self.shared.get("engine_stats", f"{market}:l", 0)}
+            except Exception:
+                pass
+        return self.asset_stats.get(market, {"w": 0, "l": 0})
 
     def analyze(self, broker, market, timeframe, candles=None, entry_time=None):
         if not candles or len(candles) < 50:
@@ -78,7 +88,7 @@ class EnhancedEngine:
                 strategy = "INSTITUTIONAL_SPIKE_REVERSAL"
 
         # 6. SELF-CORRECTION (If we had a recent loss on this asset, be extra careful)
-        stats = self.asset_stats.get(market, {"w": 0, "l": 0})
+        stats = self._market_stats(market)
         if stats['l'] > stats['w'] and stats['l'] > 2:
             # If we are failing on this asset, increase threshold or skip
             if confidence < 99:
@@ -95,6 +105,11 @@ class EnhancedEngine:
         """Called by app.py to update local learning engine"""
         if market not in self.asset_stats:
             self.asset_stats[market] = {"w": 0, "l": 0}
+        if self.shared is not None:
+            try:
+                self.shared.incr("engine_stats", f"{market}:{'w' if result == 'WIN' else 'l'}")
+            except Exception:
+                pass
         
         if result == "WIN":
             self.asset_stats[market]["w"] += 1
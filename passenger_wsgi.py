@@ -4,9 +4,10 @@ import os
 # 1. Add current directory to sys.path so Python can find app.py
 sys.path.insert(0, os.path.dirname(__file__))
 
-# 2. Import the Flask 'app' object
+# 2. Build the Flask app (starts the background services once per process)
 # 'application' is the standard variable name Passenger looks for
-from app import app as application
+from app import create_app
+application = create_app()
 
 # 3. Optional: Set Environment Variables specifically for cPanel
 # You can also set these in the cPanel "Setup Python App" dashboard